@@ -0,0 +1,305 @@
+import errno
+import hashlib
+import inspect
+import json
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Iterator
+
+from game.main import Engine, GestureSuit, RockPaperScissor, get_cache_directory
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore
+    import msvcrt
+
+CONFIG_KEYS = (
+    "height",
+    "width",
+    "count_rock",
+    "count_paper",
+    "count_scissor",
+    "game_mode",
+    "layout",
+)
+
+
+def get_config(**config: Any) -> dict[str, Any]:
+    """Returns the full game configuration, filling in the defaults of `RockPaperScissor`"""
+    unknown_keys = set(config) - set(CONFIG_KEYS)
+    if unknown_keys:
+        raise Exception(f"Unknown configuration keys: {sorted(unknown_keys)}")
+
+    parameters = inspect.signature(RockPaperScissor).parameters
+    return {key: config.get(key, parameters[key].default) for key in CONFIG_KEYS}
+
+
+def simulate(
+    seed: int,
+    max_rounds: int | None = None,
+    record_rounds: bool = False,
+    engine: Engine | str = Engine.OBJECT,
+    **config: Any,
+) -> dict[str, Any]:
+    """
+    Plays a seeded game headlessly until it is over or `max_rounds` is reached.
+    Every engine plays the same game, so `engine` only affects the speed.
+
+    The state of the global random generator is restored afterwards. The
+    result holds the winning suit (None if the game was stopped early), the
+    number of rounds played and, with `record_rounds`, the remaining count of
+    every suit after each round.
+    """
+    state = random.getstate()
+    random.seed(seed)
+
+    try:
+        game = RockPaperScissor(engine=engine, **get_config(**config))
+        rounds = []
+
+        while game.advance(max_rounds):
+            if record_rounds:
+                rounds.append(
+                    [game.stats[f"remaining_{suit.value}"] for suit in GestureSuit]
+                )
+    finally:
+        random.setstate(state)
+
+    result: dict[str, Any] = {
+        "winner": game.get_winning_suit().value if game.is_game_over else None,
+        "round_count": game.stats["round_number"],
+    }
+    if record_rounds:
+        result["rounds"] = rounds
+    return result
+
+
+class ResultCache:
+    """
+    Content-addressed cache of `simulate` results stored as one JSON file per
+    entry. Entries are written atomically, so several processes can share the
+    same directory. Writes are serialised by a lock file, with `fcntl` on POSIX
+    and `msvcrt` on Windows.
+
+    The total size of the entries is kept in a small index file, updated under
+    a file lock on every write. The directory is only scanned once that total
+    grows beyond `max_size` bytes, to evict the least recently used entries
+    and the temporary files left behind by killed writers.
+    """
+
+    LOCK_FILE_NAME = ".lock"
+    SIZE_FILE_NAME = ".size"
+
+    # Eviction shrinks the cache down to this fraction of `max_size`, so that
+    # a full cache is not rescanned on every write
+    EVICTION_RATIO = 0.9
+
+    # Temporary files older than this (in seconds) belong to killed writers
+    STALE_TEMP_FILE_AGE = 3600
+
+    # On Windows an entry cannot be replaced while another process reads it:
+    # the write is retried this many times, then skipped
+    REPLACE_ATTEMPTS = 5
+    REPLACE_RETRY_DELAY = 0.05
+
+    def __init__(self, directory: str | None = None, max_size: int = 256 * 2**20):
+        self.directory = directory or get_cache_directory("results")
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def get_key(seed: int, max_rounds: int | None = None, **config: Any) -> str:
+        full_config = {
+            key: value.value if isinstance(value, Enum) else value
+            for key, value in get_config(**config).items()
+        }
+
+        payload = json.dumps(
+            {
+                "config": full_config,
+                "seed": seed,
+                "max_rounds": max_rounds,
+                "engine_version": RockPaperScissor.ENGINE_VERSION,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        path = self._get_path(key)
+        try:
+            with open(path) as f:
+                result = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return result
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        with open(os.path.join(self.directory, self.LOCK_FILE_NAME), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                yield
+            else:  # pragma: no cover - Windows only
+                # LK_LOCK gives up after 10 seconds, keep waiting like flock
+                while True:
+                    try:
+                        msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)  # type: ignore
+                        break
+                    except OSError as e:
+                        if e.errno != errno.EDEADLOCK:
+                            raise
+                try:
+                    yield
+                finally:
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)  # type: ignore
+
+    def _read_size(self) -> int | None:
+        try:
+            with open(os.path.join(self.directory, self.SIZE_FILE_NAME)) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_size(self, size: int):
+        with open(os.path.join(self.directory, self.SIZE_FILE_NAME), "w") as f:
+            f.write(str(size))
+
+    def set(self, key: str, result: dict[str, Any]):
+        path = self._get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(result, f)
+            entry_size = os.path.getsize(temp_path)
+
+            with self._lock():
+                try:
+                    previous_size = os.path.getsize(path)
+                except FileNotFoundError:
+                    previous_size = 0
+
+                if not self._replace(temp_path, path):
+                    os.unlink(temp_path)
+                    return
+
+                size = self._read_size()
+                if size is not None:
+                    size += entry_size - previous_size
+
+                if size is None or size > self.max_size:
+                    size = self._evict()
+                self._write_size(size)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def _replace(self, temp_path: str, path: str) -> bool:
+        """Moves the temporary file over the entry, returns False if it could not"""
+        for _ in range(self.REPLACE_ATTEMPTS):
+            try:
+                os.replace(temp_path, path)
+                return True
+            except PermissionError:
+                time.sleep(self.REPLACE_RETRY_DELAY)
+
+        return False
+
+    def _get_entries(self) -> list[tuple[float, int, str]]:
+        """Returns the modification time, size and path of every entry and temporary file"""
+        entries = []
+        for dir_entry in os.scandir(self.directory):
+            if not dir_entry.is_dir():
+                continue
+
+            for file_entry in os.scandir(dir_entry.path):
+                if not file_entry.name.endswith((".json", ".tmp")):
+                    continue
+
+                try:
+                    stat = file_entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, file_entry.path))
+
+        return entries
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> int:
+        """
+        Removes stale temporary files, then the least recently used entries
+        once the cache exceeds `max_size`, until it fits in `EVICTION_RATIO`
+        of it. Must be called under the lock.
+        Returns the remaining size.
+        """
+        stale_time = time.time() - self.STALE_TEMP_FILE_AGE
+        entries = []
+        for entry in self._get_entries():
+            if entry[2].endswith(".tmp") and entry[0] < stale_time:
+                self._remove(entry[2])
+            else:
+                entries.append(entry)
+
+        entries.sort()
+        size = sum(entry[1] for entry in entries)
+        if size <= self.max_size:
+            return size
+
+        for _, entry_size, path in entries:
+            if size <= self.max_size * self.EVICTION_RATIO:
+                break
+
+            # Temporary files being written by other processes are only counted
+            if not path.endswith(".tmp"):
+                self._remove(path)
+                size -= entry_size
+
+        return size
+
+    def clear(self):
+        with self._lock():
+            for _, _, path in self._get_entries():
+                if path.endswith(".json"):
+                    self._remove(path)
+            self._write_size(self._evict())
+
+    def run(
+        self,
+        seed: int,
+        max_rounds: int | None = None,
+        record_rounds: bool = False,
+        engine: Engine | str = Engine.OBJECT,
+        **config: Any,
+    ) -> dict[str, Any]:
+        """Returns the cached result of `simulate`, running and storing it on a miss"""
+        key = self.get_key(seed, max_rounds, **config)
+
+        result = self.get(key)
+        if result is not None and (not record_rounds or "rounds" in result):
+            if not record_rounds:
+                # Same keys as `simulate`, whatever an earlier call recorded
+                result.pop("rounds", None)
+            return result
+
+        result = simulate(seed, max_rounds, record_rounds, engine, **config)
+        self.set(key, result)
+        return result
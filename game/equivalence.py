@@ -0,0 +1,256 @@
+import math
+from typing import Any, Callable, Iterable
+
+from game.cache import simulate
+from game.main import GestureSuit
+
+# Same signature as `simulate`
+Simulator = Callable[..., dict[str, Any]]
+
+
+def _gamma_q(a: float, x: float) -> float:
+    """Regularised upper incomplete gamma function Q(a, x)"""
+    if x <= 0:
+        return 1.0
+
+    log_prefix = -x + a * math.log(x) - math.lgamma(a)
+
+    if x < a + 1:
+        term = total = 1 / a
+        denominator = a
+        for _ in range(1000):
+            denominator += 1
+            term *= x / denominator
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1 - total * math.exp(log_prefix))
+
+    # Continued fraction, evaluated with the modified Lentz method
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = d if abs(d) > tiny else tiny
+        c = b + an / c
+        c = c if abs(c) > tiny else tiny
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+def chi_square_test(table: list[list[int]]) -> tuple[float, float]:
+    """Chi-square test of homogeneity, returning the statistic and the p-value"""
+    columns = [c for c in range(len(table[0])) if any(row[c] for row in table)]
+    rows = [row for row in table if any(row[c] for c in columns)]
+    if len(rows) < 2 or len(columns) < 2:
+        return 0.0, 1.0
+
+    row_totals = [sum(row[c] for c in columns) for row in rows]
+    column_totals = [sum(row[c] for row in rows) for c in columns]
+    total = sum(row_totals)
+
+    statistic = 0.0
+    for row, row_total in zip(rows, row_totals):
+        for c, column_total in zip(columns, column_totals):
+            expected = row_total * column_total / total
+            statistic += (row[c] - expected) ** 2 / expected
+
+    degrees_of_freedom = (len(rows) - 1) * (len(columns) - 1)
+    return statistic, _gamma_q(degrees_of_freedom / 2, statistic / 2)
+
+
+def _kolmogorov_q(lam: float) -> float:
+    """
+    Survival function of the Kolmogorov distribution, as `probks` in Numerical
+    Recipes: the alternating series converges poorly for small `lam`, where
+    the p-value is 1 anyway, and 1 is also returned if it does not converge.
+    """
+    if lam < 0.2:
+        return 1.0
+
+    total = 0.0
+    previous_term = 0.0
+    sign = 2.0
+    for k in range(1, 101):
+        term = sign * math.exp(-2 * k**2 * lam**2)
+        total += term
+        if abs(term) <= 1e-3 * previous_term or abs(term) <= 1e-8 * total:
+            return min(1.0, max(0.0, total))
+        sign = -sign
+        previous_term = abs(term)
+
+    return 1.0
+
+
+def ks_test(a: list[float], b: list[float]) -> tuple[float, float]:
+    """Two-sample Kolmogorov-Smirnov test with the asymptotic p-value"""
+    if not a or not b:
+        return 0.0, 1.0
+
+    a = sorted(a)
+    b = sorted(b)
+    i = j = 0
+    statistic = 0.0
+    while i < len(a) and j < len(b):
+        value = min(a[i], b[j])
+        while i < len(a) and a[i] == value:
+            i += 1
+        while j < len(b) and b[j] == value:
+            j += 1
+        statistic = max(statistic, abs(i / len(a) - j / len(b)))
+
+    if not statistic:
+        return 0.0, 1.0
+
+    effective_size = math.sqrt(len(a) * len(b) / (len(a) + len(b)))
+    lam = (effective_size + 0.12 + 0.11 / effective_size) * statistic
+    return statistic, _kolmogorov_q(lam)
+
+
+class EquivalenceReport:
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        # (name, p-value) of every statistical check
+        self.checks: list[tuple[str, float]] = []
+        # Seeds whose results differ when the engines are deterministic
+        self.mismatches: list[str] = []
+
+    @property
+    def corrected_alpha(self) -> float:
+        """Bonferroni-corrected significance level"""
+        return self.alpha / max(1, len(self.checks))
+
+    @property
+    def failed_checks(self) -> list[tuple[str, float]]:
+        return [check for check in self.checks if check[1] < self.corrected_alpha]
+
+    @property
+    def passed(self) -> bool:
+        return not self.mismatches and not self.failed_checks
+
+    def __str__(self) -> str:
+        lines = [
+            f"{'Passed' if self.passed else 'Failed'}: "
+            f"{len(self.checks)} statistical checks, "
+            f"{len(self.mismatches)} mismatches"
+        ]
+        lines += [f"Mismatch: {mismatch}" for mismatch in self.mismatches]
+        lines += [f"Failed: {name} (p={p:.3g})" for name, p in self.failed_checks]
+        return "\n".join(lines)
+
+
+def _get_count_at_round(result: dict[str, Any], round_number: int, index: int):
+    rounds = result["rounds"]
+    if not rounds:
+        return None
+    return rounds[min(round_number, len(rounds)) - 1][index]
+
+
+def _compare_distributions(
+    report: EquivalenceReport,
+    name: str,
+    reference_results: list[dict[str, Any]],
+    candidate_results: list[dict[str, Any]],
+    max_rounds: int | None,
+    trajectory_rounds: Iterable[int],
+):
+    winners = [suit.value for suit in GestureSuit] + [None]
+    table = [
+        [[r["winner"] for r in results].count(winner) for winner in winners]
+        for results in (reference_results, candidate_results)
+    ]
+    report.checks.append((f"{name}: winner", chi_square_test(table)[1]))
+
+    report.checks.append(
+        (
+            f"{name}: game length",
+            ks_test(
+                [r["round_count"] for r in reference_results],
+                [r["round_count"] for r in candidate_results],
+            )[1],
+        )
+    )
+
+    for round_number in trajectory_rounds:
+        if max_rounds is not None and round_number > max_rounds:
+            continue
+
+        for index, suit in enumerate(GestureSuit):
+            samples = [
+                [
+                    count
+                    for r in results
+                    if (count := _get_count_at_round(r, round_number, index))
+                    is not None
+                ]
+                for results in (reference_results, candidate_results)
+            ]
+            report.checks.append(
+                (
+                    f"{name}: remaining {suit.value} at round {round_number}",
+                    ks_test(*samples)[1],
+                )
+            )
+
+
+def compare_engines(
+    candidate: Simulator,
+    configs: list[dict[str, Any]],
+    seeds: Iterable[int],
+    reference: Simulator = simulate,
+    max_rounds: int | None = None,
+    deterministic: bool = False,
+    alpha: float = 0.01,
+    trajectory_rounds: Iterable[int] = (1, 5, 10, 25, 50, 100),
+) -> EquivalenceReport:
+    """
+    Runs the reference and candidate engines over the same seeded
+    configurations.
+
+    Deterministic engines must return exactly the same result for every seed.
+    Otherwise, for every configuration, the winner frequencies are compared
+    with a chi-square test, and the game lengths and the remaining counts of
+    every suit at `trajectory_rounds` with Kolmogorov-Smirnov tests, all at a
+    Bonferroni-corrected significance level.
+    """
+    report = EquivalenceReport(alpha)
+    seeds = list(seeds)
+    trajectory_rounds = list(trajectory_rounds)
+
+    for config in configs:
+        name = ", ".join(f"{key}={value}" for key, value in config.items())
+        reference_results = [
+            reference(seed, max_rounds, True, **config) for seed in seeds
+        ]
+        candidate_results = [
+            candidate(seed, max_rounds, True, **config) for seed in seeds
+        ]
+
+        if deterministic:
+            report.mismatches += [
+                f"{name}, seed={seed}"
+                for seed, reference_result, candidate_result in zip(
+                    seeds, reference_results, candidate_results
+                )
+                if reference_result != candidate_result
+            ]
+        else:
+            _compare_distributions(
+                report,
+                name,
+                reference_results,
+                candidate_results,
+                max_rounds,
+                trajectory_rounds,
+            )
+
+    return report
@@ -0,0 +1,211 @@
+import os
+import struct
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Iterator
+
+from game.main import GestureSuit, RockPaperScissor
+
+# Palette index 0 is reserved for empty cells
+SUIT_TO_PALETTE_INDEX = {
+    GestureSuit.ROCK: 1,
+    GestureSuit.PAPER: 2,
+    GestureSuit.SCISSOR: 3,
+}
+
+PALETTE: list[tuple[int, int, int]] = [
+    (0x20, 0x20, 0x20),
+    (0x8C, 0x8C, 0x8C),
+    (0xF2, 0xEB, 0xD3),
+    (0xD6, 0x45, 0x45),
+]
+
+
+class FrameExporter(ABC):
+    """
+    Turns the board into palette-indexed frames, one `scale` x `scale` block of
+    pixels per cell, and hands them row by row to `_write_frame`. Subclasses
+    never hold more than one frame row at a time.
+    """
+
+    def __init__(self, game: RockPaperScissor, scale: int = 4):
+        if scale < 1:
+            raise Exception("The scale must be a positive integer")
+
+        self.game = game
+        self.scale = scale
+        self.width = game.N * scale
+        self.height = game.M * scale
+        self.count_frames = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _get_frame_rows(self) -> Iterator[bytes]:
+        for row in self.game.matrix:
+            # Reads the created cells only, so exporting creates no empty cells
+            row_indices = bytearray(self.game.N)
+            for cell in row.created_cells():
+                if cell.gesture:
+                    row_indices[cell.n] = SUIT_TO_PALETTE_INDEX[cell.gesture.suit]
+
+            indices = bytes(row_indices)
+            if self.scale > 1:
+                indices = bytes(i for i in indices for _ in range(self.scale))
+
+            for _ in range(self.scale):
+                yield indices
+
+    @abstractmethod
+    def _write_frame(self, rows: Iterator[bytes]):
+        pass
+
+    def write_frame(self):
+        self._write_frame(self._get_frame_rows())
+        self.count_frames += 1
+
+    def close(self):
+        pass
+
+
+class ImageSequenceExporter(FrameExporter):
+    """Writes every frame to its own binary PPM file inside `directory`"""
+
+    FILE_NAME = "frame_{:06d}.ppm"
+
+    def __init__(self, game: RockPaperScissor, directory: str, scale: int = 4):
+        super().__init__(game, scale)
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._palette_rgb = [bytes(color) for color in PALETTE]
+
+    def _write_frame(self, rows: Iterator[bytes]):
+        path = os.path.join(self.directory, self.FILE_NAME.format(self.count_frames))
+        with open(path, "wb") as f:
+            f.write(f"P6\n{self.width} {self.height}\n255\n".encode())
+            for row in rows:
+                f.write(b"".join(self._palette_rgb[i] for i in row))
+
+
+class GifExporter(FrameExporter):
+    """
+    Streams the frames to an animated GIF. Each frame is LZW-encoded while its
+    rows are produced and flushed in sub-blocks, so memory does not grow with
+    the number of rounds.
+    """
+
+    MIN_CODE_SIZE = 2
+    MAX_CODE_SIZE = 12
+
+    def __init__(
+        self,
+        game: RockPaperScissor,
+        path: str,
+        scale: int = 4,
+        frame_delay: float = 0.1,
+        loop: bool = True,
+    ):
+        super().__init__(game, scale)
+        if self.width > 0xFFFF or self.height > 0xFFFF:
+            raise Exception("The board is too large to be exported as a GIF")
+
+        self.frame_delay = frame_delay
+        self.f: BinaryIO = open(path, "wb")
+        self._write_header(loop)
+
+    def _write_header(self, loop: bool):
+        # Logical screen with a global colour table of 2 ** (0 + 2) entries
+        self.f.write(b"GIF89a")
+        self.f.write(struct.pack("<HHBBB", self.width, self.height, 0xF1, 0, 0))
+        for color in PALETTE:
+            self.f.write(bytes(color))
+
+        if loop:
+            self.f.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def _write_frame(self, rows: Iterator[bytes]):
+        delay = round(self.frame_delay * 100)
+        self.f.write(struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 0, delay, 0, 0))
+        self.f.write(b"\x2C" + struct.pack("<HHHHB", 0, 0, self.width, self.height, 0))
+        self.f.write(bytes([self.MIN_CODE_SIZE]))
+        self._write_lzw(rows)
+        self.f.write(b"\x00")
+
+    def _write_lzw(self, rows: Iterator[bytes]):
+        clear_code = 1 << self.MIN_CODE_SIZE
+        end_code = clear_code + 1
+        max_codes = 1 << self.MAX_CODE_SIZE
+
+        table: dict[int, int] = {}
+        next_code = end_code + 1
+        code_size = self.MIN_CODE_SIZE + 1
+
+        block = bytearray()
+        bits = 0
+        count_bits = 0
+
+        def emit(code: int):
+            nonlocal bits, count_bits
+            bits |= code << count_bits
+            count_bits += code_size
+            while count_bits >= 8:
+                block.append(bits & 0xFF)
+                bits >>= 8
+                count_bits -= 8
+                if len(block) == 255:
+                    self.f.write(b"\xFF" + block)
+                    block.clear()
+
+        emit(clear_code)
+        prefix = -1
+        for row in rows:
+            for pixel in row:
+                if prefix < 0:
+                    prefix = pixel
+                    continue
+
+                key = prefix << 8 | pixel
+                code = table.get(key)
+                if code is not None:
+                    prefix = code
+                    continue
+
+                emit(prefix)
+                if next_code < max_codes:
+                    table[key] = next_code
+                    next_code += 1
+                    if next_code > 1 << code_size and code_size < self.MAX_CODE_SIZE:
+                        code_size += 1
+                else:
+                    emit(clear_code)
+                    table.clear()
+                    next_code = end_code + 1
+                    code_size = self.MIN_CODE_SIZE + 1
+                prefix = pixel
+
+        if prefix >= 0:
+            emit(prefix)
+        emit(end_code)
+        if count_bits:
+            block.append(bits & 0xFF)
+        if block:
+            self.f.write(bytes([len(block)]) + block)
+
+    def close(self):
+        if not self.f.closed:
+            self.f.write(b"\x3B")
+            self.f.close()
+
+
+def export_game(
+    game: RockPaperScissor, exporter: FrameExporter, max_rounds: int | None = None
+):
+    """Plays `game` headlessly, writing a frame before the first round and after each one"""
+    with exporter:
+        exporter.write_frame()
+
+        while game.advance(max_rounds):
+            exporter.write_frame()
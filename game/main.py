@@ -1,9 +1,15 @@
+import json
+import math
 import os
+import platform
 import random
+import select
+import shutil
 import sys
+import tempfile
 from enum import Enum
-from time import sleep
-from typing import Self  # type: ignore
+from time import perf_counter, sleep
+from typing import Any, Iterator, Self, overload  # type: ignore
 
 
 class GestureSuit(Enum):
@@ -16,6 +22,25 @@ class GameMode(Enum):
     TRANSFORM = "transform"
 
 
+class Layout(Enum):
+    RANDOM = "random"
+    CLUSTERED = "clustered"
+    STRIPES = "stripes"
+
+
+class Engine(Enum):
+    AUTO = "auto"
+    OBJECT = "object"
+    INDEXED = "indexed"
+
+
+def get_cache_directory(name: str) -> str:
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(root, "rock_paper_scissor", name)
+
+
 class Gesture:
     SUIT_TO_EMOJI = {
         GestureSuit.ROCK: "🪨".strip(),
@@ -50,10 +75,18 @@ class Gesture:
 class Cell:
     GAME_MODE_TO_FUNCTION_NAME = {item: f"_challenge_{item.value}" for item in GameMode}
 
-    def __init__(self, game: "RockPaperScissor", gesture: Gesture | None = None):
+    def __init__(
+        self,
+        game: "RockPaperScissor",
+        gesture: Gesture | None = None,
+        m: int = 0,
+        n: int = 0,
+    ):
         self.game = game
-        self.m: int  # y coordinate
-        self.n: int  # x coordinate
+        self.m = m  # y coordinate
+        self.n = n  # x coordinate
+        # Only set by the indexed engine, once a gesture stands on the cell
+        self.neighbours: list[Cell]
 
         self.gesture: Gesture | None = gesture
 
@@ -81,22 +114,28 @@ class Cell:
             raise Exception("This cell does not have a gesture")
 
         if self.gesture > incoming:
+            old_suit = incoming.suit
             self.stats[f"remaining_{incoming.suit.value}"] -= 1
             incoming.transform(self.gesture.suit)
             self.stats[f"remaining_{self.gesture.suit.value}"] += 1
+            self.game._on_gesture_transformed(incoming, old_suit)
 
         else:
+            old_suit = self.gesture.suit
             self.stats[f"remaining_{self.gesture.suit.value}"] -= 1
             self.gesture.transform(incoming.suit)
             self.stats[f"remaining_{incoming.suit.value}"] += 1
+            self.game._on_gesture_transformed(self.gesture, old_suit)
 
     def _get_challenge_function(self):
         return getattr(self, self.GAME_MODE_TO_FUNCTION_NAME[self.game.GAME_MODE])
 
     def run_challenge(self, incoming: Gesture):
         if self._is_empty:
-            incoming.cell.remove_gesture()
+            from_cell = incoming.cell
+            from_cell.remove_gesture()
             self._assign_gesture(incoming)
+            self.game._on_gesture_moved(from_cell, self, incoming.suit)
         else:
             challenge_function = self._get_challenge_function()
             challenge_function(incoming)
@@ -107,7 +146,431 @@ class Cell:
         return str(self.gesture)
 
 
+class CellRow:
+    """
+    Row `m` of the board, indexed like a list of cells. Only the occupied
+    cells are created upfront, the empty ones are created the first time
+    they are accessed, so the startup follows the number of gestures rather
+    than the size of the board. `cells` holds the cells created so far by x
+    coordinate, and is shared with the game.
+    """
+
+    def __init__(self, game: "RockPaperScissor", m: int, cells: dict[int, Cell]):
+        self.game = game
+        self.m = m
+        self._cells = cells
+
+    def __len__(self) -> int:
+        return self.game.N
+
+    def __iter__(self) -> Iterator[Cell]:
+        for n in range(self.game.N):
+            yield self[n]
+
+    @overload
+    def __getitem__(self, n: int) -> Cell:
+        ...
+
+    @overload
+    def __getitem__(self, n: slice) -> list[Cell]:
+        ...
+
+    def __getitem__(self, n: int | slice) -> Cell | list[Cell]:
+        if isinstance(n, slice):
+            return [self[j] for j in range(*n.indices(self.game.N))]
+
+        cell = self._cells.get(n)
+        if cell is not None:
+            return cell
+
+        if not -self.game.N <= n < self.game.N:
+            raise IndexError("cell index out of range")
+        if n < 0:
+            return self[n + self.game.N]
+
+        cell = self._cells[n] = Cell(self.game, None, self.m, n)
+        return cell
+
+    def created_cells(self) -> list[Cell]:
+        """Returns the cells created so far, without creating the others"""
+        return list(self._cells.values())
+
+
+class KeyReader:
+    """
+    Reads key presses without blocking while the game runs. On POSIX terminals
+    stdin is switched to cbreak mode for the duration of the `with` block.
+    Arrow keys are reported as "up", "down", "left" and "right".
+    """
+
+    ESCAPE_SEQUENCE_TO_KEY = {
+        "\x1b[A": "up",
+        "\x1b[B": "down",
+        "\x1b[C": "right",
+        "\x1b[D": "left",
+    }
+
+    WINDOWS_SCAN_CODE_TO_KEY = {
+        "H": "up",
+        "P": "down",
+        "M": "right",
+        "K": "left",
+    }
+
+    def __init__(self) -> None:
+        self._terminal_attributes: list | None = None
+
+    def __enter__(self):
+        if os.name == "posix" and sys.stdin.isatty():
+            import termios
+            import tty
+
+            fd = sys.stdin.fileno()
+            self._terminal_attributes = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+        return self
+
+    def __exit__(self, *args):
+        if self._terminal_attributes is not None:
+            import termios
+
+            termios.tcsetattr(
+                sys.stdin.fileno(), termios.TCSADRAIN, self._terminal_attributes
+            )
+            self._terminal_attributes = None
+
+    def _read_posix(self) -> str:
+        if self._terminal_attributes is None:
+            return ""
+
+        fd = sys.stdin.fileno()
+        data = b""
+        while select.select([fd], [], [], 0)[0]:
+            chunk = os.read(fd, 64)
+            if not chunk:
+                break
+            data += chunk
+        return data.decode(errors="ignore")
+
+    def read_keys(self) -> list[str]:
+        if os.name != "posix":
+            import msvcrt
+
+            keys = []
+            while msvcrt.kbhit():  # type: ignore
+                char = msvcrt.getwch()  # type: ignore
+                if char in ("\x00", "\xe0"):
+                    code = msvcrt.getwch()  # type: ignore
+                    keys.append(self.WINDOWS_SCAN_CODE_TO_KEY.get(code, ""))
+                else:
+                    keys.append(char)
+            return [key for key in keys if key]
+
+        data = self._read_posix()
+        keys = []
+        while data:
+            for sequence, key in self.ESCAPE_SEQUENCE_TO_KEY.items():
+                if data.startswith(sequence):
+                    keys.append(key)
+                    data = data[len(sequence) :]
+                    break
+            else:
+                keys.append(data[0])
+                data = data[1:]
+        return keys
+
+
+class Viewport:
+    """
+    Renders a window of the board sized to the terminal.
+
+    When zoomed out each character stands for a `zoom` x `zoom` block of cells
+    and shows either the majority suit of the block or a density glyph. Block
+    counts are kept up to date from the moves and transformations of each
+    round, so rendering only walks the visible blocks.
+    """
+
+    SUIT_TO_GLYPH = {
+        GestureSuit.ROCK: "R",
+        GestureSuit.PAPER: "P",
+        GestureSuit.SCISSOR: "S",
+    }
+
+    DENSITY_GLYPHS = " .:-=+*#%@"
+
+    # Lines taken by the header written by `RockPaperScissor._print_board`
+    HEADER_LINES = 14
+
+    # Characters the window moves by for every arrow key press
+    PAN_STEP = 4
+
+    KEY_TO_FUNCTION_CALL: dict[str, tuple[str, tuple[int, ...]]] = {
+        "up": ("pan", (-PAN_STEP, 0)),
+        "down": ("pan", (PAN_STEP, 0)),
+        "left": ("pan", (0, -PAN_STEP)),
+        "right": ("pan", (0, PAN_STEP)),
+        "+": ("zoom_in", ()),
+        "=": ("zoom_in", ()),
+        "-": ("zoom_out", ()),
+    }
+
+    def __init__(
+        self,
+        game: "RockPaperScissor",
+        zoom: int = 1,
+        density: bool = False,
+        rows: int | None = None,
+        cols: int | None = None,
+    ):
+        self.game = game
+        self.density = density
+        self.rows = rows
+        self.cols = cols
+
+        # Top-left corner of the window, in cell coordinates
+        self.top = 0
+        self.left = 0
+
+        self.zoom: int
+        self.blocks_m: int
+        self.blocks_n: int
+        self._counts: dict[GestureSuit, list[int]] = {}
+        self.set_zoom(zoom)
+
+    def _get_size(self) -> tuple[int, int]:
+        terminal_size = shutil.get_terminal_size()
+        rows = self.rows or terminal_size.lines - self.HEADER_LINES
+        cols = self.cols or terminal_size.columns - 2
+        return max(1, rows), max(1, cols)
+
+    def _get_block_index(self, cell: Cell) -> int:
+        return (cell.m // self.zoom) * self.blocks_n + cell.n // self.zoom
+
+    def _init_blocks(self):
+        self.blocks_m = -(-self.game.M // self.zoom)
+        self.blocks_n = -(-self.game.N // self.zoom)
+        self._counts = {
+            suit: [0] * (self.blocks_m * self.blocks_n) for suit in GestureSuit
+        }
+
+        for gesture in self.game.gestures:
+            self._counts[gesture.suit][self._get_block_index(gesture.cell)] += 1
+
+    def on_gesture_moved(self, from_cell: Cell, to_cell: Cell, suit: GestureSuit):
+        counts = self._counts[suit]
+        counts[self._get_block_index(from_cell)] -= 1
+        counts[self._get_block_index(to_cell)] += 1
+
+    def on_gesture_transformed(
+        self, cell: Cell, old_suit: GestureSuit, new_suit: GestureSuit
+    ):
+        index = self._get_block_index(cell)
+        self._counts[old_suit][index] -= 1
+        self._counts[new_suit][index] += 1
+
+    def set_zoom(self, zoom: int):
+        if zoom < 1:
+            raise Exception("The zoom must be a positive integer")
+
+        self.zoom = zoom
+        self._init_blocks()
+        self.pan(0, 0)
+
+    def zoom_in(self):
+        self.set_zoom(max(1, self.zoom // 2))
+
+    def zoom_out(self):
+        self.set_zoom(self.zoom * 2)
+
+    def fit(self):
+        rows, cols = self._get_size()
+        if self.game.M <= rows and 3 * self.game.N - 1 <= cols:
+            self.set_zoom(1)
+        else:
+            self.set_zoom(max(2, -(-self.game.M // rows), -(-self.game.N // cols)))
+
+    def pan(self, dm: int, dn: int):
+        """Moves the window by `dm` rows and `dn` columns of characters"""
+        self.top = min(max(0, self.top + dm * self.zoom), self.game.M - 1)
+        self.left = min(max(0, self.left + dn * self.zoom), self.game.N - 1)
+
+    def handle_key(self, key: str) -> bool:
+        """Pans or zooms according to `key`, returning whether the window changed"""
+        if key not in self.KEY_TO_FUNCTION_CALL:
+            return False
+
+        function_name, args = self.KEY_TO_FUNCTION_CALL[key]
+        getattr(self, function_name)(*args)
+        return True
+
+    def _get_glyph(self, index: int) -> str:
+        counts = {suit: self._counts[suit][index] for suit in GestureSuit}
+        total = sum(counts.values())
+        if not total:
+            return " "
+
+        if self.density:
+            levels = len(self.DENSITY_GLYPHS) - 1
+            return self.DENSITY_GLYPHS[-(-total * levels // self.zoom**2)]
+
+        return self.SUIT_TO_GLYPH[max(counts, key=counts.__getitem__)]
+
+    def render(self) -> str:
+        rows, cols = self._get_size()
+
+        if self.zoom == 1:
+            width = max(1, (cols + 1) // 3)
+            visible = range(self.left, min(self.left + width, self.game.N))
+            return "".join(
+                "|" + "·".join(f"{str(row[j]):^0}" for j in visible) + "|\n"
+                for row in self.game.matrix[self.top : self.top + rows]
+            )
+
+        top = self.top // self.zoom
+        left = self.left // self.zoom
+        lines = []
+        for bm in range(top, min(top + rows, self.blocks_m)):
+            base = bm * self.blocks_n
+            lines.append(
+                "|"
+                + "".join(
+                    self._get_glyph(base + bn)
+                    for bn in range(left, min(left + cols, self.blocks_n))
+                )
+                + "|\n"
+            )
+        return "".join(lines)
+
+
+class EngineCalibration:
+    """
+    Per-machine timings of the engines, measured once on a small board and
+    cached on disk, then kept in memory for the rest of the process. All
+    timings are in seconds.
+    """
+
+    FILE_NAME = "calibration.json"
+
+    BOARD: dict[str, Any] = {
+        "height": 40,
+        "width": 40,
+        "count_rock": 100,
+        "count_paper": 100,
+        "count_scissor": 100,
+    }
+    ROUNDS = 5
+
+    # Calibrations already loaded by this process, by path
+    _loaded: dict[str, "EngineCalibration"] = {}
+
+    def __init__(self, object_move: float, indexed_move: float, indexed_setup: float):
+        self.object_move = object_move  # per gesture move
+        self.indexed_move = indexed_move  # per gesture move
+        self.indexed_setup = indexed_setup  # per neighbour list
+
+    @staticmethod
+    def _get_machine_key() -> str:
+        return "-".join(
+            [
+                platform.node(),
+                platform.machine(),
+                platform.python_implementation(),
+                platform.python_version(),
+                f"cpu{os.cpu_count()}",
+                f"v{RockPaperScissor.ENGINE_VERSION}",
+            ]
+        )
+
+    @classmethod
+    def _create_board(cls) -> "RockPaperScissor":
+        random.seed(0)
+        game = RockPaperScissor(**cls.BOARD)
+        # Create the empty cells upfront, so that no timing includes them
+        for row in game.matrix:
+            for _ in row:
+                pass
+        return game
+
+    @classmethod
+    def measure(cls) -> "EngineCalibration":
+        state = random.getstate()
+        try:
+            game = cls._create_board()
+            start = perf_counter()
+            for _ in range(cls.ROUNDS):
+                game._move_gestures_object()
+            object_move = (perf_counter() - start) / (cls.ROUNDS * game.COUNT_GESTURES)
+
+            game = cls._create_board()
+            start = perf_counter()
+            for row in game.matrix:
+                for cell in row:
+                    cell.neighbours = game._get_all_surrounding_cells(cell)
+            indexed_setup = (perf_counter() - start) / game.COUNT_CELLS
+
+            start = perf_counter()
+            for _ in range(cls.ROUNDS):
+                game._move_gestures_indexed()
+            indexed_move = (perf_counter() - start) / (cls.ROUNDS * game.COUNT_GESTURES)
+        finally:
+            random.setstate(state)
+
+        return cls(object_move, indexed_move, indexed_setup)
+
+    @classmethod
+    def load(cls, path: str | None = None) -> "EngineCalibration":
+        """Returns the calibration of this machine, measuring it on the first call"""
+        path = path or os.path.join(get_cache_directory("engines"), cls.FILE_NAME)
+
+        calibration = cls._loaded.get(path)
+        if calibration is None:
+            calibration = cls._loaded[path] = cls._read_or_measure(path)
+        return calibration
+
+    @classmethod
+    def _read_or_measure(cls, path: str) -> "EngineCalibration":
+        key = cls._get_machine_key()
+
+        try:
+            with open(path) as f:
+                calibrations = json.load(f)
+            return cls(**calibrations[key])
+        except (OSError, ValueError, KeyError, TypeError):
+            calibrations = {}
+
+        calibration = cls.measure()
+        calibrations[key] = vars(calibration)
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(calibrations, f)
+            os.replace(temp_path, path)
+        except OSError:
+            pass
+
+        return calibration
+
+
 class RockPaperScissor:
+    # Bump whenever a change alters the outcome of a seeded game
+    ENGINE_VERSION = 3
+
+    LAYOUT_TO_FUNCTION_NAME = {item: f"_place_gestures_{item.value}" for item in Layout}
+
+    ENGINE_TO_FUNCTION_NAME = {
+        item: f"_move_gestures_{item.value}" for item in Engine if item != Engine.AUTO
+    }
+
+    # Number of rounds the setup cost of an engine is spread over by `Engine.AUTO`
+    AUTO_ENGINE_HORIZON_ROUNDS = 100
+
+    # `Engine.AUTO` never picks the indexed engine if its neighbour lists, of
+    # about `NEIGHBOURS_SIZE` bytes each, could grow beyond this many bytes
+    AUTO_ENGINE_MEMORY_LIMIT = 256 * 2**20
+    NEIGHBOURS_SIZE = 120
+
     def __init__(
         self,
         height: int = 15,
@@ -117,6 +580,9 @@ class RockPaperScissor:
         count_scissor: int = 50,
         game_mode: GameMode = GameMode.TRANSFORM,
         round_delay: float = 0.2,
+        viewport: bool = False,
+        engine: Engine | str = Engine.OBJECT,
+        layout: Layout | str = Layout.RANDOM,
     ):
         self.M = height
         self.N = width
@@ -127,13 +593,24 @@ class RockPaperScissor:
         self.COUNT_SCISSOR = count_scissor
         self.COUNT_GESTURES = self.COUNT_ROCK + self.COUNT_PAPER + self.COUNT_SCISSOR
 
+        if self.COUNT_GESTURES > self.COUNT_CELLS:
+            raise Exception("The board is too small for the gestures")
+
         self.ROUND_DELAY = round_delay
 
         self.GAME_MODE = game_mode
+        self.LAYOUT = Layout(layout)
+
+        self.ENGINE = Engine(engine)
+        self.engine_reason = "requested explicitly"
+        if self.ENGINE == Engine.AUTO:
+            self.ENGINE, self.engine_reason = self._select_engine()
+
         self.gestures: list[Gesture] = []
         self._init_gestures()
 
-        self.matrix: list[list[Cell]] = []
+        self._cells: list[dict[int, Cell]] = []  # shared with the rows of `matrix`
+        self.matrix: list[CellRow] = []
         self._init_matrix()
 
         self.stats = {
@@ -143,29 +620,138 @@ class RockPaperScissor:
             f"remaining_{GestureSuit.SCISSOR.value}": self.COUNT_SCISSOR,
         }
 
+        self.viewport: Viewport | None = None
+        if viewport:
+            self.viewport = Viewport(self)
+            self.viewport.fit()
+
+    @property
+    def _suit_counts(self) -> list[tuple[GestureSuit, int]]:
+        return [
+            (GestureSuit.ROCK, self.COUNT_ROCK),
+            (GestureSuit.PAPER, self.COUNT_PAPER),
+            (GestureSuit.SCISSOR, self.COUNT_SCISSOR),
+        ]
+
     def _init_gestures(self):
-        self.gestures = (
-            [Gesture(GestureSuit.ROCK) for _ in range(self.COUNT_ROCK)]
-            + [Gesture(GestureSuit.PAPER) for _ in range(self.COUNT_PAPER)]
-            + [Gesture(GestureSuit.SCISSOR) for _ in range(self.COUNT_SCISSOR)]
-        )
+        self.gestures = [
+            Gesture(suit) for suit, count in self._suit_counts for _ in range(count)
+        ]
+
+    def _place_gestures_random(self) -> list[int]:
+        # Partial Fisher-Yates shuffle or set-based sampling, depending on how
+        # full the board is: either way only COUNT_GESTURES draws are made
+        return random.sample(range(self.COUNT_CELLS), self.COUNT_GESTURES)
+
+    def _place_gestures_clustered(self) -> list[int]:
+        """
+        Places every suit around its own random centre, sampling within a
+        square which doubles in size whenever it gets too crowded. Once the
+        square covers the whole board the remaining gestures are sampled
+        uniformly over it, rejecting the cells already taken.
+        """
+        positions: list[int] = []
+        taken: set[int] = set()
+
+        for _, count in self._suit_counts:
+            centre_m = random.randrange(self.M)
+            centre_n = random.randrange(self.N)
+            half_side = math.isqrt(count)
+            misses = 0
+            remaining = count
+
+            while remaining:
+                if half_side >= max(self.M, self.N):
+                    m, n = divmod(random.randrange(self.COUNT_CELLS), self.N)
+                else:
+                    m = centre_m + random.randint(-half_side, half_side)
+                    n = centre_n + random.randint(-half_side, half_side)
+
+                position = m * self.N + n
+                if 0 <= m < self.M and 0 <= n < self.N and position not in taken:
+                    taken.add(position)
+                    positions.append(position)
+                    remaining -= 1
+                    continue
+
+                misses += 1
+                if misses > count:
+                    half_side = 2 * half_side + 1
+                    misses = 0
+
+        return positions
+
+    def _place_gestures_stripes(self) -> list[int]:
+        """Places every suit at random within its own vertical stripe"""
+        positions = []
+
+        for i, (_, count) in enumerate(self._suit_counts):
+            start = i * self.N // 3
+            width = (i + 1) * self.N // 3 - start
+            if count > width * self.M:
+                raise Exception("The board is too small for the stripes layout")
+
+            positions += [
+                x // width * self.N + start + x % width
+                for x in random.sample(range(width * self.M), count)
+            ]
+
+        return positions
 
     def _init_matrix(self):
-        cells = [Cell(self, gesture) for gesture in self.gestures]
-        cells += [Cell(self) for _ in range(self.COUNT_CELLS - self.COUNT_GESTURES)]
-        random.shuffle(cells)
-
-        self.matrix = []
-        x = 0
-        for i in range(self.M):
-            row = []
-            for j in range(self.N):
-                cell = cells[x]
-                cell.m = i
-                cell.n = j
-                row.append(cell)
-                x += 1
-            self.matrix.append(row)
+        positions = getattr(self, self.LAYOUT_TO_FUNCTION_NAME[self.LAYOUT])()
+        self._cells = [{} for _ in range(self.M)]
+        for position, gesture in zip(positions, self.gestures):
+            i, j = divmod(position, self.N)
+            self._cells[i][j] = Cell(self, gesture, i, j)
+
+        self.matrix = [CellRow(self, i, cells) for i, cells in enumerate(self._cells)]
+
+    def _select_engine(self) -> tuple[Engine, str]:
+        """
+        Picks the engine with the lowest estimated cost over
+        `AUTO_ENGINE_HORIZON_ROUNDS` rounds. All engines play exactly the same
+        game, so only speed is taken into account, unless the neighbour lists
+        of the indexed engine could exceed `AUTO_ENGINE_MEMORY_LIMIT`.
+        """
+        calibration = EngineCalibration.load()
+        count_moves = self.COUNT_GESTURES * self.AUTO_ENGINE_HORIZON_ROUNDS
+        # A gesture moves at most once per round, so this bounds the number
+        # of cells the indexed engine builds a neighbour list for
+        count_neighbours = min(self.COUNT_CELLS, self.COUNT_GESTURES + count_moves)
+        neighbours_size = count_neighbours * self.NEIGHBOURS_SIZE
+
+        costs = {
+            Engine.OBJECT: count_moves * calibration.object_move,
+            Engine.INDEXED: count_neighbours * calibration.indexed_setup
+            + count_moves * calibration.indexed_move,
+        }
+        estimates = ", ".join(f"{e.value}: {c * 1000:.1f}ms" for e, c in costs.items())
+
+        fastest = "fastest"
+        if neighbours_size > self.AUTO_ENGINE_MEMORY_LIMIT:
+            del costs[Engine.INDEXED]
+            fastest = "fastest within the memory limit"
+            estimates += (
+                f"; {Engine.INDEXED.value} excluded, its neighbour lists could take"
+                f" {neighbours_size / 2**20:.0f}MB"
+                f" (limit {self.AUTO_ENGINE_MEMORY_LIMIT / 2**20:.0f}MB)"
+            )
+        engine = min(costs, key=costs.__getitem__)
+
+        reason = (
+            f"{fastest} for {self.COUNT_GESTURES} gestures on {self.COUNT_CELLS} cells"
+            f" over {self.AUTO_ENGINE_HORIZON_ROUNDS} rounds ({estimates})"
+        )
+        return engine, reason
+
+    def _on_gesture_moved(self, from_cell: Cell, to_cell: Cell, suit: GestureSuit):
+        if self.viewport is not None:
+            self.viewport.on_gesture_moved(from_cell, to_cell, suit)
+
+    def _on_gesture_transformed(self, gesture: Gesture, old_suit: GestureSuit):
+        if self.viewport is not None:
+            self.viewport.on_gesture_transformed(gesture.cell, old_suit, gesture.suit)
 
     def _get_all_surrounding_cells(self, cell: Cell):
         m = cell.m
@@ -182,8 +768,9 @@ class RockPaperScissor:
             (m + 1, n + 1),
         )
 
+        # Reads the created cells directly, as this runs on every move
         return [
-            self.matrix[i][j]
+            self._cells[i].get(j) or self.matrix[i][j]
             for i, j in coords_list
             if 0 <= i < self.M and 0 <= j < self.N
         ]
@@ -205,17 +792,57 @@ class RockPaperScissor:
         new_cell = random.choice(surrounding_cells)
         new_cell.run_challenge(gesture)
 
-    def _move_gestures(self):
+    def _move_gestures_object(self):
         random.shuffle(self.gestures)
 
         for gesture in self.gestures:
             self._move_gesture(gesture)
 
-    def _play_round(self):
+    def _move_gestures_indexed(self):
+        # Same moves and random draws as `_move_gestures_object`, caching the
+        # neighbours of every cell a gesture stands on, so that memory follows
+        # the cells actually visited rather than the size of the board
+        random.shuffle(self.gestures)
+        choice = random.choice
+
+        for gesture in self.gestures:
+            cell = gesture.cell
+            try:
+                neighbours = cell.neighbours
+            except AttributeError:
+                neighbours = cell.neighbours = self._get_all_surrounding_cells(cell)
+
+            suit = gesture.suit
+            cells = [
+                c for c in neighbours if c.gesture is None or c.gesture.suit != suit
+            ]
+            if cells:
+                choice(cells).run_challenge(gesture)
+
+    def _move_gestures(self):
+        getattr(self, self.ENGINE_TO_FUNCTION_NAME[self.ENGINE])()
+
+    def _advance_round(self):
         self.stats["round_number"] += 1
 
         self._move_gestures()
 
+    def advance(self, max_rounds: int | None = None) -> bool:
+        """
+        Plays one round without printing anything, unless the game is over or
+        `max_rounds` rounds have been played. Returns whether a round was played.
+        """
+        if self.is_game_over:
+            return False
+        if max_rounds is not None and self.stats["round_number"] >= max_rounds:
+            return False
+
+        self._advance_round()
+        return True
+
+    def _play_round(self):
+        self._advance_round()
+
         self._print_board()
 
     @staticmethod
@@ -239,8 +866,16 @@ Round: {self.stats["round_number"] or "-":<4}
         \n"""
         )
 
-        for row in self.matrix:
-            sys.stdout.write("|" + "·".join(f"{str(cell):^0}" for cell in row) + "|\n")
+        if self.viewport is not None:
+            sys.stdout.write(
+                f"Zoom: 1:{self.viewport.zoom:<4} Arrows: pan   +/-: zoom\n\n"
+            )
+            sys.stdout.write(self.viewport.render())
+        else:
+            for row in self.matrix:
+                sys.stdout.write(
+                    "|" + "·".join(f"{str(cell):^0}" for cell in row) + "|\n"
+                )
 
         sys.stdout.write("\n")
 
@@ -258,7 +893,31 @@ Round: {self.stats["round_number"] or "-":<4}
             if self.stats[f"remaining_{suite.value}"]:
                 return suite
 
+    def _wait_for_next_round(self, key_reader: KeyReader):
+        """Sleeps for `ROUND_DELAY`, redrawing the board whenever the viewport moves"""
+        deadline = perf_counter() + self.ROUND_DELAY
+
+        while True:
+            if self.viewport is not None:
+                handled = [self.viewport.handle_key(k) for k in key_reader.read_keys()]
+                if any(handled):
+                    self._print_board()
+
+            remaining = deadline - perf_counter()
+            if remaining <= 0:
+                break
+            sleep(min(remaining, 0.05))
+
     def play(self):
+        if self.viewport is None:
+            self._play()
+        else:
+            with KeyReader() as key_reader:
+                self._play(key_reader)
+
+        self._print_winner()
+
+    def _play(self, key_reader: KeyReader | None = None):
         self._print_board()
 
         while True:
@@ -266,8 +925,12 @@ Round: {self.stats["round_number"] or "-":<4}
             if self.is_game_over:
                 break
 
-            sleep(self.ROUND_DELAY)
+            if key_reader is None:
+                sleep(self.ROUND_DELAY)
+            else:
+                self._wait_for_next_round(key_reader)
 
+    def _print_winner(self):
         sys.stdout.write(
             f"""
 The winner is {self.get_winning_suit().value.title()}!!!
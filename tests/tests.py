@@ -1,11 +1,43 @@
+import os
+import random
 import signal
+import struct
+import tempfile
+from functools import partial
 from io import StringIO
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
 from parameterized import parameterized  # type: ignore
 
-from game.main import Cell, GameMode, Gesture, GestureSuit, RockPaperScissor
+from game.cache import ResultCache, get_config, simulate
+from game.equivalence import (
+    _gamma_q,
+    _kolmogorov_q,
+    chi_square_test,
+    compare_engines,
+    ks_test,
+)
+from game.export import (
+    PALETTE,
+    SUIT_TO_PALETTE_INDEX,
+    FrameExporter,
+    GifExporter,
+    ImageSequenceExporter,
+    export_game,
+)
+from game.main import (
+    Cell,
+    Engine,
+    EngineCalibration,
+    GameMode,
+    Gesture,
+    GestureSuit,
+    KeyReader,
+    Layout,
+    RockPaperScissor,
+    Viewport,
+)
 
 
 def abort_after_timeout(timeout):
@@ -26,6 +58,63 @@ def abort_after_timeout(timeout):
     return decorator
 
 
+def decode_gif_frames(data):
+    """Minimal GIF decoder returning the palette indices of each frame"""
+    width, height = struct.unpack("<HH", data[6:10])
+    pos = 13 + 3 * 2 ** ((data[10] & 0x07) + 1)
+    frames = []
+
+    while data[pos] != 0x3B:
+        if data[pos] == 0x21:
+            pos += 2
+            while data[pos]:
+                pos += data[pos] + 1
+            pos += 1
+            continue
+
+        pos += 10
+        min_code_size = data[pos]
+        pos += 1
+        stream = b""
+        while data[pos]:
+            stream += data[pos + 1 : pos + 1 + data[pos]]
+            pos += data[pos] + 1
+        pos += 1
+
+        bits = int.from_bytes(stream, "little")
+        clear_code = 1 << min_code_size
+        code_size = min_code_size + 1
+        table = []
+        pixels = []
+        previous = None
+        while True:
+            code = bits & ((1 << code_size) - 1)
+            bits >>= code_size
+            if code == clear_code:
+                table = [[i] for i in range(clear_code)] + [None, None]
+                code_size = min_code_size + 1
+                previous = None
+                continue
+            if code == clear_code + 1:
+                break
+
+            if code < len(table):
+                entry = table[code]
+                if previous is not None:
+                    table.append(previous + entry[:1])
+            else:
+                entry = previous + previous[:1]
+                table.append(entry)
+            pixels += entry
+            previous = entry
+            if len(table) == 1 << code_size and code_size < 12:
+                code_size += 1
+
+        frames.append([pixels[i * width : (i + 1) * width] for i in range(height)])
+
+    return frames
+
+
 class GestureTests(TestCase):
     def test_init(self):
         g = Gesture(GestureSuit.ROCK)
@@ -201,8 +290,8 @@ class CellTests(TestCase):
 
 
 class RockPaperScissorTests(TestCase):
-    @patch("game.main.random.shuffle")
-    def test_init(self, shuffle):
+    @patch("game.main.random.sample", lambda population, k: list(population)[:k])
+    def test_init(self):
         game = RockPaperScissor(
             height=3,
             width=5,
@@ -235,6 +324,127 @@ class RockPaperScissorTests(TestCase):
         self.assertEqual(3, game.stats[f"remaining_{GestureSuit.PAPER.value}"])
         self.assertEqual(4, game.stats[f"remaining_{GestureSuit.SCISSOR.value}"])
 
+    def test_init_creates_only_occupied_cells(self):
+        game = RockPaperScissor(
+            height=100, width=200, count_rock=10, count_paper=10, count_scissor=10
+        )
+        self.assertEqual(30, sum(len(row.created_cells()) for row in game.matrix))
+        self.assertTrue(
+            all(cell.gesture for row in game.matrix for cell in row.created_cells())
+        )
+
+        cell = game.matrix[-1][-1]
+        self.assertEqual((99, 199), (cell.m, cell.n))
+        self.assertIs(cell, game.matrix[99][199])
+        self.assertEqual(200, len(game.matrix[0]))
+
+        with self.assertRaises(IndexError):
+            game.matrix[0][200]
+
+    def test_cell_row_behaves_like_a_list(self):
+        game = RockPaperScissor(
+            height=3, width=5, count_rock=1, count_paper=0, count_scissor=0
+        )
+        row = game.matrix[1]
+
+        self.assertEqual([(1, 1), (1, 3)], [(c.m, c.n) for c in row[1:4:2]])
+        self.assertEqual([row[3], row[4]], row[-2:])
+        self.assertEqual(list(row), row[:])
+        self.assertIn(row[2], row)
+        self.assertEqual(5, len(row))
+
+    def test_init_too_many_gestures(self):
+        with self.assertRaisesRegex(
+            Exception, "The board is too small for the gestures"
+        ):
+            RockPaperScissor(height=5, width=5, count_rock=10, count_paper=10)
+
+    def _get_suit_positions(self, game):
+        positions = {suit: [] for suit in GestureSuit}
+        for row in game.matrix:
+            for cell in row:
+                if cell.gesture:
+                    positions[cell.gesture.suit].append((cell.m, cell.n))
+        return positions
+
+    @parameterized.expand([(layout,) for layout in Layout])
+    def test_init_layout(self, layout):
+        game = RockPaperScissor(
+            height=20,
+            width=30,
+            count_rock=40,
+            count_paper=50,
+            count_scissor=60,
+            layout=layout,
+        )
+
+        for i, row in enumerate(game.matrix):
+            for j, cell in enumerate(row):
+                self.assertEqual((i, j), (cell.m, cell.n))
+
+        positions = self._get_suit_positions(game)
+        self.assertEqual(40, len(positions[GestureSuit.ROCK]))
+        self.assertEqual(50, len(positions[GestureSuit.PAPER]))
+        self.assertEqual(60, len(positions[GestureSuit.SCISSOR]))
+
+        for gesture in game.gestures:
+            self.assertIs(gesture, gesture.cell.gesture)
+
+    def test_place_gestures_stripes(self):
+        game = RockPaperScissor(
+            height=10,
+            width=9,
+            count_rock=30,
+            count_paper=5,
+            count_scissor=20,
+            layout=Layout.STRIPES,
+        )
+        positions = self._get_suit_positions(game)
+
+        self.assertTrue(all(n < 3 for _, n in positions[GestureSuit.ROCK]))
+        self.assertTrue(all(3 <= n < 6 for _, n in positions[GestureSuit.PAPER]))
+        self.assertTrue(all(6 <= n for _, n in positions[GestureSuit.SCISSOR]))
+
+    def test_place_gestures_stripes_too_many_gestures(self):
+        with self.assertRaisesRegex(
+            Exception, "The board is too small for the stripes layout"
+        ):
+            RockPaperScissor(
+                height=10,
+                width=9,
+                count_rock=31,
+                count_paper=0,
+                count_scissor=0,
+                layout=Layout.STRIPES,
+            )
+
+    @patch("game.main.random.randrange", lambda stop: stop // 2)
+    def test_place_gestures_clustered(self):
+        game = RockPaperScissor(
+            height=100,
+            width=100,
+            count_rock=50,
+            count_paper=0,
+            count_scissor=0,
+            layout=Layout.CLUSTERED,
+        )
+
+        # The first square has a half side of isqrt(50) = 7 cells
+        for m, n in self._get_suit_positions(game)[GestureSuit.ROCK]:
+            self.assertLessEqual(abs(m - 50), 7)
+            self.assertLessEqual(abs(n - 50), 7)
+
+    def test_place_gestures_clustered_full_board(self):
+        game = RockPaperScissor(
+            height=5,
+            width=5,
+            count_rock=10,
+            count_paper=10,
+            count_scissor=5,
+            layout=Layout.CLUSTERED,
+        )
+        self.assertTrue(all(cell.gesture for row in game.matrix for cell in row))
+
     def test_get_all_surrounding_cells(self):
         game = RockPaperScissor()
 
@@ -402,6 +612,22 @@ class RockPaperScissorTests(TestCase):
         game._move_gestures()
         self.assertEqual(len(game.gestures), len(_move_gesture.call_args_list))
 
+    @patch.object(RockPaperScissor, "_advance_round")
+    def test_advance(self, _advance_round):
+        game = RockPaperScissor()
+        self.assertTrue(game.advance())
+        _advance_round.assert_called_once_with()
+
+        game.stats["round_number"] = 5
+        self.assertTrue(game.advance(max_rounds=6))
+        self.assertFalse(game.advance(max_rounds=5))
+        self.assertEqual(2, _advance_round.call_count)
+
+        game.stats[f"remaining_{GestureSuit.PAPER.value}"] = 0
+        game.stats[f"remaining_{GestureSuit.SCISSOR.value}"] = 0
+        self.assertFalse(game.advance())
+        self.assertEqual(2, _advance_round.call_count)
+
     @patch.object(RockPaperScissor, "_move_gestures")
     @patch.object(RockPaperScissor, "_print_board")
     def test_play_round(self, _print_board, _move_gestures):
@@ -493,3 +719,725 @@ class RockPaperScissorTests(TestCase):
     def test_integration(self, _clear_screen, mock_out):
         game = RockPaperScissor(round_delay=0)
         game.play()
+
+
+class ViewportTests(TestCase):
+    def _get_full_counts(self, viewport):
+        counts = {suit: [0] * len(viewport._counts[suit]) for suit in GestureSuit}
+        for row in viewport.game.matrix:
+            for cell in row:
+                if cell.gesture:
+                    index = viewport._get_block_index(cell)
+                    counts[cell.gesture.suit][index] += 1
+        return counts
+
+    def test_init_blocks(self):
+        game = RockPaperScissor(
+            height=10, width=7, count_rock=5, count_paper=5, count_scissor=5
+        )
+        viewport = Viewport(game, zoom=3)
+
+        self.assertEqual(4, viewport.blocks_m)
+        self.assertEqual(3, viewport.blocks_n)
+        self.assertEqual(self._get_full_counts(viewport), viewport._counts)
+
+    def test_counts_are_updated_incrementally(self):
+        game = RockPaperScissor(height=20, width=20)
+        game.viewport = Viewport(game, zoom=4)
+
+        for _ in range(5):
+            game._move_gestures()
+
+        self.assertEqual(self._get_full_counts(game.viewport), game.viewport._counts)
+
+    def test_set_zoom_invalid(self):
+        game = RockPaperScissor()
+        with self.assertRaisesRegex(Exception, "The zoom must be a positive integer"):
+            Viewport(game, zoom=0)
+
+    def test_zoom_in_and_out(self):
+        game = RockPaperScissor()
+        viewport = Viewport(game)
+
+        viewport.zoom_out()
+        self.assertEqual(2, viewport.zoom)
+        self.assertEqual(self._get_full_counts(viewport), viewport._counts)
+
+        viewport.zoom_in()
+        viewport.zoom_in()
+        self.assertEqual(1, viewport.zoom)
+
+    def test_pan(self):
+        game = RockPaperScissor(
+            height=10, width=10, count_rock=5, count_paper=5, count_scissor=5
+        )
+        viewport = Viewport(game, zoom=2)
+
+        viewport.pan(2, 3)
+        self.assertEqual((4, 6), (viewport.top, viewport.left))
+
+        viewport.pan(-10, 10)
+        self.assertEqual((0, 9), (viewport.top, viewport.left))
+
+    def test_fit(self):
+        game = RockPaperScissor(height=100, width=300, count_rock=0, count_paper=0)
+        viewport = Viewport(game, rows=20, cols=50)
+
+        viewport.fit()
+        self.assertEqual(6, viewport.zoom)
+
+        game = RockPaperScissor(
+            height=5, width=5, count_rock=0, count_paper=0, count_scissor=5
+        )
+        viewport = Viewport(game, zoom=4, rows=20, cols=50)
+
+        viewport.fit()
+        self.assertEqual(1, viewport.zoom)
+
+    @parameterized.expand(
+        [
+            (False, "|PS|\n|  |\n"),
+            (True, "|#-|\n|  |\n"),
+        ]
+    )
+    def test_render_blocks(self, density, expected):
+        game = RockPaperScissor(
+            height=4, width=4, count_rock=1, count_paper=2, count_scissor=0
+        )
+        for row in game.matrix:
+            for cell in row:
+                if cell.gesture:
+                    cell.remove_gesture()
+
+        r, p1, p2 = game.gestures
+        game.matrix[0][0]._assign_gesture(r)
+        game.matrix[0][1]._assign_gesture(p1)
+        game.matrix[1][0]._assign_gesture(p2)
+        game.matrix[1][3]._assign_gesture(Gesture(GestureSuit.SCISSOR))
+        game.gestures.append(game.matrix[1][3].gesture)
+
+        viewport = Viewport(game, zoom=2, density=density, rows=10, cols=10)
+        self.assertEqual(expected, viewport.render())
+
+    def test_render_is_bounded_by_size(self):
+        game = RockPaperScissor(height=50, width=50)
+
+        viewport = Viewport(game, rows=5, cols=11)
+        lines = viewport.render().splitlines()
+        self.assertEqual(5, len(lines))
+        self.assertEqual(4, lines[0].count("·") + 1)
+
+        viewport.set_zoom(4)
+        lines = viewport.render().splitlines()
+        self.assertEqual(5, len(lines))
+        self.assertEqual(11 + 2, len(lines[0]))
+
+    @patch("sys.stdout", new_callable=StringIO)
+    @patch.object(RockPaperScissor, "_clear_screen")
+    def test_print_board_with_viewport(self, _clear_screen, mock_out):
+        game = RockPaperScissor()
+        game.viewport = MagicMock(zoom=4)
+        game.viewport.render.return_value = "|viewport|\n"
+
+        game._print_board()
+
+        self.assertIn("Zoom: 1:4", mock_out.getvalue())
+        self.assertIn("|viewport|", mock_out.getvalue())
+
+    @parameterized.expand(
+        [
+            ("up", (6, 8)),
+            ("down", (14, 8)),
+            ("left", (10, 4)),
+            ("right", (10, 12)),
+        ]
+    )
+    def test_handle_key_pan(self, key, expected):
+        game = RockPaperScissor(height=40, width=40)
+        viewport = Viewport(game)
+        viewport.top, viewport.left = 10, 8
+
+        self.assertTrue(viewport.handle_key(key))
+        self.assertEqual(expected, (viewport.top, viewport.left))
+
+    def test_handle_key_zoom(self):
+        viewport = Viewport(RockPaperScissor(), zoom=2)
+
+        self.assertTrue(viewport.handle_key("-"))
+        self.assertEqual(4, viewport.zoom)
+        self.assertTrue(viewport.handle_key("+"))
+        self.assertEqual(2, viewport.zoom)
+        self.assertFalse(viewport.handle_key("x"))
+        self.assertEqual(2, viewport.zoom)
+
+    @patch("game.main.os.name", "posix")
+    @patch.object(KeyReader, "_read_posix")
+    def test_read_keys(self, _read_posix):
+        _read_posix.return_value = "\x1b[A+\x1b[Dq\x1b[C\x1b[B-"
+        self.assertEqual(
+            ["up", "+", "left", "q", "right", "down", "-"], KeyReader().read_keys()
+        )
+
+    def test_read_keys_not_a_terminal(self):
+        with patch("sys.stdin", new_callable=StringIO):
+            with KeyReader() as key_reader:
+                self.assertEqual([], key_reader.read_keys())
+
+    @patch.object(RockPaperScissor, "_print_board")
+    def test_wait_for_next_round(self, _print_board):
+        game = RockPaperScissor(round_delay=0)
+        game.viewport = MagicMock()
+        game.viewport.handle_key.side_effect = lambda key: key == "+"
+        key_reader = MagicMock()
+
+        key_reader.read_keys.return_value = ["x"]
+        game._wait_for_next_round(key_reader)
+        self.assertFalse(_print_board.called)
+
+        key_reader.read_keys.return_value = ["x", "+"]
+        game._wait_for_next_round(key_reader)
+        _print_board.assert_called_once_with()
+
+    @abort_after_timeout(10)
+    @patch("sys.stdout", new_callable=StringIO)
+    @patch.object(RockPaperScissor, "_clear_screen")
+    @patch.object(KeyReader, "read_keys")
+    def test_play_with_viewport(self, read_keys, _clear_screen, mock_out):
+        keys = iter([["-"]])
+        read_keys.side_effect = lambda: next(keys, [])
+        game = RockPaperScissor(round_delay=0, viewport=True)
+
+        game.play()
+
+        self.assertTrue(read_keys.called)
+        self.assertIn("The winner is", mock_out.getvalue())
+
+
+class RecordingExporter(FrameExporter):
+    """Keeps every frame in memory as a list of rows"""
+
+    def __init__(self, game, scale=4):
+        super().__init__(game, scale)
+        self.frames = []
+
+    def _write_frame(self, rows):
+        self.frames.append(list(rows))
+
+
+class FrameExporterTests(TestCase):
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            FrameExporter(RockPaperScissor())
+
+    def test_scale_invalid(self):
+        with self.assertRaisesRegex(Exception, "The scale must be a positive integer"):
+            RecordingExporter(RockPaperScissor(), scale=0)
+
+    def test_get_frame_rows(self):
+        game = RockPaperScissor(
+            height=2, width=3, count_rock=1, count_paper=1, count_scissor=1
+        )
+        exporter = RecordingExporter(game, scale=2)
+        exporter.write_frame()
+        self.assertEqual(1, exporter.count_frames)
+        self.assertEqual(3, sum(len(row.created_cells()) for row in game.matrix))
+
+        expected = []
+        for row in game.matrix:
+            indices = [
+                SUIT_TO_PALETTE_INDEX[cell.gesture.suit] if cell.gesture else 0
+                for cell in row
+            ]
+            scaled = bytes(i for i in indices for _ in range(2))
+            expected += [scaled, scaled]
+
+        self.assertEqual([expected], exporter.frames)
+
+    def test_gif_exporter(self):
+        game = RockPaperScissor(
+            height=30, width=40, count_rock=200, count_paper=200, count_scissor=200
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game.gif")
+            frames = []
+
+            class RecordingGifExporter(GifExporter):
+                def _write_frame(self, rows):
+                    rows = list(rows)
+                    frames.append([list(row) for row in rows])
+                    super()._write_frame(iter(rows))
+
+            export_game(game, RecordingGifExporter(game, path, scale=2), max_rounds=5)
+
+            with open(path, "rb") as f:
+                data = f.read()
+
+        self.assertEqual(b"GIF89a", data[:6])
+        self.assertEqual((80, 60), struct.unpack("<HH", data[6:10]))
+        self.assertEqual(6, len(frames))
+        self.assertEqual(frames, decode_gif_frames(data))
+
+    def test_image_sequence_exporter(self):
+        game = RockPaperScissor(
+            height=4, width=5, count_rock=2, count_paper=2, count_scissor=2
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            export_game(
+                game, ImageSequenceExporter(game, directory, scale=3), max_rounds=2
+            )
+
+            self.assertEqual(
+                ["frame_000000.ppm", "frame_000001.ppm", "frame_000002.ppm"],
+                sorted(os.listdir(directory)),
+            )
+
+            with open(os.path.join(directory, "frame_000002.ppm"), "rb") as f:
+                data = f.read()
+
+        header = b"P6\n15 12\n255\n"
+        self.assertTrue(data.startswith(header))
+        self.assertEqual(15 * 12 * 3, len(data) - len(header))
+
+        cell = game.matrix[0][0]
+        index = SUIT_TO_PALETTE_INDEX[cell.gesture.suit] if cell.gesture else 0
+        self.assertEqual(bytes(PALETTE[index]), data[len(header) : len(header) + 3])
+
+    @patch.object(RockPaperScissor, "_advance_round")
+    def test_export_game_stops_when_game_is_over(self, _advance_round):
+        game = RockPaperScissor(count_paper=0, count_scissor=0)
+        exporter = MagicMock()
+
+        export_game(game, exporter)
+
+        exporter.write_frame.assert_called_once_with()
+        self.assertFalse(_advance_round.called)
+
+
+SMALL_CONFIG = {
+    "height": 10,
+    "width": 10,
+    "count_rock": 10,
+    "count_paper": 10,
+    "count_scissor": 10,
+}
+
+
+class SimulateTests(TestCase):
+    def test_get_config(self):
+        self.assertEqual(
+            {
+                "height": 15,
+                "width": 20,
+                "count_rock": 50,
+                "count_paper": 50,
+                "count_scissor": 50,
+                "game_mode": GameMode.TRANSFORM,
+                "layout": Layout.RANDOM,
+            },
+            get_config(width=20),
+        )
+
+    def test_get_config_unknown_keys(self):
+        with self.assertRaisesRegex(Exception, "Unknown configuration keys"):
+            get_config(round_delay=0)
+
+    def test_simulate_is_deterministic(self):
+        result = simulate(7, record_rounds=True, **SMALL_CONFIG)
+        self.assertEqual(result, simulate(7, record_rounds=True, **SMALL_CONFIG))
+
+        self.assertIn(result["winner"], [suit.value for suit in GestureSuit])
+        self.assertEqual(result["round_count"], len(result["rounds"]))
+        self.assertEqual(1, len([count for count in result["rounds"][-1] if count]))
+
+    def test_simulate_max_rounds(self):
+        result = simulate(7, max_rounds=2)
+        self.assertEqual({"winner": None, "round_count": 2}, result)
+
+    @patch("game.cache.random.seed")
+    def test_simulate_restores_random_state(self, _):
+        state = random.getstate()
+        simulate(7, max_rounds=2)
+        self.assertEqual(state, random.getstate())
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_key(self):
+        key = ResultCache.get_key(1, height=10)
+
+        self.assertEqual(key, ResultCache.get_key(1, height=10, width=15))
+        self.assertNotEqual(key, ResultCache.get_key(2, height=10))
+        self.assertNotEqual(key, ResultCache.get_key(1, height=10, max_rounds=5))
+        self.assertNotEqual(key, ResultCache.get_key(1, height=11))
+        self.assertNotEqual(key, ResultCache.get_key(1, height=10, layout="stripes"))
+
+        with patch.object(RockPaperScissor, "ENGINE_VERSION", -1):
+            self.assertNotEqual(key, ResultCache.get_key(1, height=10))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get("ab" * 32))
+
+    def test_get_corrupted(self):
+        key = "ab" * 32
+        self.cache.set(key, {})
+        with open(self.cache._get_path(key), "w") as f:
+            f.write("{")
+
+        self.assertIsNone(self.cache.get(key))
+
+    def test_set_and_get(self):
+        key = "ab" * 32
+        self.cache.set(key, {"winner": "rock", "round_count": 3})
+        self.assertEqual({"winner": "rock", "round_count": 3}, self.cache.get(key))
+
+    @patch("game.cache.simulate")
+    def test_run(self, simulate_mock):
+        simulate_mock.side_effect = simulate
+
+        result = self.cache.run(3, **SMALL_CONFIG)
+        self.assertEqual(result, self.cache.run(3, **SMALL_CONFIG))
+        self.assertEqual(result, simulate(3, **SMALL_CONFIG))
+        self.assertEqual(1, simulate_mock.call_count)
+
+        # Per-round summaries are only computed when missing from the entry
+        result = self.cache.run(3, record_rounds=True, **SMALL_CONFIG)
+        self.assertIn("rounds", result)
+        self.assertEqual(result, self.cache.run(3, record_rounds=True, **SMALL_CONFIG))
+        self.assertEqual(simulate(3, **SMALL_CONFIG), self.cache.run(3, **SMALL_CONFIG))
+        self.assertEqual(2, simulate_mock.call_count)
+
+    def test_evict_least_recently_used(self):
+        keys = [f"{i:02d}" * 32 for i in range(4)]
+        for i, key in enumerate(keys):
+            self.cache.set(key, {"padding": "x" * 20})
+            os.utime(self.cache._get_path(key), (i, i))
+
+        # Every entry takes 35 bytes, eviction goes down to 108 bytes
+        self.cache.max_size = 120
+
+        # Reading an entry makes it the most recently used one
+        self.cache.get(keys[0])
+        self.cache.set("99" * 32, {"padding": "x" * 20})
+
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNone(self.cache.get(keys[2]))
+        self.assertIsNotNone(self.cache.get(keys[3]))
+        self.assertIsNotNone(self.cache.get("99" * 32))
+
+    def test_set_keeps_running_size(self):
+        self.cache.set("01" * 32, {"padding": "x" * 20})
+        self.assertEqual(35, self.cache._read_size())
+
+        with patch.object(ResultCache, "_get_entries") as _get_entries:
+            self.cache.set("02" * 32, {"padding": "x" * 20})
+            # Overwriting an entry only counts the difference in size
+            self.cache.set("02" * 32, {"padding": "x" * 10})
+
+        self.assertFalse(_get_entries.called)
+        self.assertEqual(60, self.cache._read_size())
+
+    def test_set_rescans_without_size(self):
+        self.cache.set("01" * 32, {"padding": "x" * 20})
+        os.unlink(os.path.join(self.temp_dir.name, ResultCache.SIZE_FILE_NAME))
+
+        self.cache.set("02" * 32, {"padding": "x" * 20})
+        self.assertEqual(70, self.cache._read_size())
+
+    @patch.object(ResultCache, "REPLACE_RETRY_DELAY", 0)
+    def test_set_retries_replace(self):
+        replace = os.replace
+        attempts = []
+
+        def locked_replace(src, dst):
+            attempts.append(dst)
+            if len(attempts) < 3:
+                raise PermissionError()
+            replace(src, dst)
+
+        key = "01" * 32
+        with patch("game.cache.os.replace", locked_replace):
+            self.cache.set(key, {"winner": "rock"})
+
+        self.assertEqual(3, len(attempts))
+        self.assertEqual({"winner": "rock"}, self.cache.get(key))
+
+    @patch.object(ResultCache, "REPLACE_RETRY_DELAY", 0)
+    def test_set_skips_entry_that_stays_locked(self):
+        self.cache.set("01" * 32, {"winner": "rock"})
+        size = self.cache._read_size()
+
+        with patch("game.cache.os.replace", side_effect=PermissionError):
+            self.cache.set("01" * 32, {"winner": "paper"})
+
+        self.assertEqual({"winner": "rock"}, self.cache.get("01" * 32))
+        self.assertEqual(size, self.cache._read_size())
+        self.assertEqual(
+            [".json"], [os.path.splitext(p)[1] for _, _, p in self.cache._get_entries()]
+        )
+
+    def test_evict_stale_temp_files(self):
+        self.cache.set("01" * 32, {})
+        directory = os.path.dirname(self.cache._get_path("01" * 32))
+
+        stale_path = os.path.join(directory, "stale.tmp")
+        fresh_path = os.path.join(directory, "fresh.tmp")
+        for path in (stale_path, fresh_path):
+            with open(path, "w") as f:
+                f.write("x" * 10)
+        os.utime(stale_path, (0, 0))
+
+        with self.cache._lock():
+            self.assertEqual(2 + 10, self.cache._evict())
+
+        self.assertFalse(os.path.exists(stale_path))
+        self.assertTrue(os.path.exists(fresh_path))
+
+    def test_clear(self):
+        key = "ab" * 32
+        self.cache.set(key, {})
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(key))
+
+
+class EquivalenceTests(TestCase):
+    @parameterized.expand(
+        [
+            (0.5, 3.841 / 2, 0.05),
+            (1, 5.991 / 2, 0.05),
+            (5, 10, 0.0293),
+            (5, 3, 0.8153),
+            (5, 0, 1),
+        ]
+    )
+    def test_gamma_q(self, a, x, expected):
+        self.assertAlmostEqual(expected, _gamma_q(a, x), places=3)
+
+    def test_chi_square_test(self):
+        statistic, p_value = chi_square_test([[10, 20, 30], [30, 20, 10]])
+        self.assertAlmostEqual(20, statistic)
+        self.assertAlmostEqual(4.54e-5, p_value, places=6)
+
+    def test_chi_square_test_single_category(self):
+        self.assertEqual((0.0, 1.0), chi_square_test([[10, 0], [20, 0]]))
+
+    def test_ks_test(self):
+        statistic, p_value = ks_test(list(range(50)), list(range(30, 80)))
+        self.assertAlmostEqual(0.6, statistic)
+        self.assertLess(p_value, 1e-6)
+
+        self.assertEqual((0.0, 1.0), ks_test([1, 2, 3], [3, 2, 1]))
+
+    @parameterized.expand([(5000,), (20000,), (100000,)])
+    def test_ks_test_large_similar_samples(self, size):
+        statistic, p_value = ks_test(list(range(size)), list(range(1, size + 1)))
+        self.assertAlmostEqual(1 / size, statistic)
+        self.assertEqual(1.0, p_value)
+
+    @parameterized.expand(
+        [
+            (0.1, 1.0),
+            (0.5, 0.9639),
+            (1.0, 0.2700),
+            (1.36, 0.0495),
+            (2.0, 0.0007),
+        ]
+    )
+    def test_kolmogorov_q(self, lam, expected):
+        self.assertAlmostEqual(expected, _kolmogorov_q(lam), places=4)
+
+    def test_compare_engines_deterministic(self):
+        report = compare_engines(simulate, [SMALL_CONFIG], range(5), deterministic=True)
+        self.assertTrue(report.passed)
+
+        def shifted(seed, *args, **kwargs):
+            return simulate(seed + 1, *args, **kwargs)
+
+        report = compare_engines(shifted, [SMALL_CONFIG], range(5), deterministic=True)
+        self.assertFalse(report.passed)
+        self.assertEqual(5, len(report.mismatches))
+
+    def test_compare_engines_statistical(self):
+        config = {
+            "height": 8,
+            "width": 8,
+            "count_rock": 6,
+            "count_paper": 6,
+            "count_scissor": 6,
+        }
+
+        def shifted(seed, *args, **kwargs):
+            return simulate(seed + 10000, *args, **kwargs)
+
+        report = compare_engines(shifted, [config], range(60))
+        self.assertTrue(report.passed, str(report))
+        self.assertEqual(20, len(report.checks))
+
+        def slower(seed, *args, **kwargs):
+            result = simulate(seed, *args, **kwargs)
+            result["round_count"] *= 2
+            return result
+
+        report = compare_engines(slower, [config], range(60))
+        self.assertFalse(report.passed)
+        self.assertEqual(
+            ["game length"], [name.split(": ")[-1] for name, _ in report.failed_checks]
+        )
+
+
+class EngineTests(TestCase):
+    @parameterized.expand(
+        [
+            ("_move_gestures_object", Engine.OBJECT),
+            ("_move_gestures_indexed", Engine.INDEXED),
+        ]
+    )
+    def test_move_gestures(self, function_name, engine):
+        game = RockPaperScissor(engine=engine)
+        with patch.object(RockPaperScissor, function_name) as move_gestures:
+            game._move_gestures()
+        move_gestures.assert_called_once_with()
+
+    def test_neighbours_cached_on_occupied_cells(self):
+        game = RockPaperScissor(30, 30, 5, 5, 5, engine="indexed")
+        self.assertFalse(
+            any(hasattr(cell, "neighbours") for row in game.matrix for cell in row)
+        )
+
+        occupied = [gesture.cell for gesture in game.gestures]
+        game._move_gestures_indexed()
+
+        for row in game.matrix:
+            for cell in row:
+                if cell in occupied:
+                    self.assertEqual(
+                        game._get_all_surrounding_cells(cell), cell.neighbours
+                    )
+                else:
+                    self.assertFalse(hasattr(cell, "neighbours"))
+
+    def test_indexed_engine_plays_the_same_game(self):
+        report = compare_engines(
+            partial(simulate, engine=Engine.INDEXED),
+            [SMALL_CONFIG, {"height": 12, "width": 20}],
+            range(5),
+            deterministic=True,
+        )
+        self.assertTrue(report.passed, str(report))
+
+    @parameterized.expand(
+        [
+            (300, 300, 10000, Engine.INDEXED),
+            (2000, 2000, 10, Engine.OBJECT),
+        ]
+    )
+    @patch.object(EngineCalibration, "load")
+    def test_select_engine(self, height, width, count, expected, load):
+        load.return_value = EngineCalibration(4e-6, 2e-6, 2e-6)
+
+        game = MagicMock(
+            COUNT_CELLS=height * width,
+            COUNT_GESTURES=3 * count,
+            AUTO_ENGINE_HORIZON_ROUNDS=100,
+            AUTO_ENGINE_MEMORY_LIMIT=256 * 2**20,
+            NEIGHBOURS_SIZE=120,
+        )
+        engine, reason = RockPaperScissor._select_engine(game)
+
+        self.assertEqual(expected, engine)
+        self.assertIn(f"fastest for {3 * count} gestures on {height * width}", reason)
+
+    @patch.object(EngineCalibration, "load")
+    def test_select_engine_memory_limit(self, load):
+        load.return_value = EngineCalibration(4e-6, 2e-6, 2e-6)
+
+        game = MagicMock(
+            COUNT_CELLS=2000 * 2000,
+            COUNT_GESTURES=300000,
+            AUTO_ENGINE_HORIZON_ROUNDS=100,
+            AUTO_ENGINE_MEMORY_LIMIT=2**30,
+            NEIGHBOURS_SIZE=120,
+        )
+        self.assertEqual(Engine.INDEXED, RockPaperScissor._select_engine(game)[0])
+
+        game.AUTO_ENGINE_MEMORY_LIMIT = 256 * 2**20
+        engine, reason = RockPaperScissor._select_engine(game)
+        self.assertEqual(Engine.OBJECT, engine)
+        self.assertTrue(reason.startswith("fastest within the memory limit for"))
+        self.assertIn("indexed excluded, its neighbour lists could take 458MB", reason)
+
+    @patch.object(RockPaperScissor, "_select_engine")
+    def test_init_auto(self, _select_engine):
+        _select_engine.return_value = (Engine.INDEXED, "reason")
+
+        game = RockPaperScissor(engine="auto")
+
+        self.assertEqual(Engine.INDEXED, game.ENGINE)
+        self.assertEqual("reason", game.engine_reason)
+        game._move_gestures()
+        self.assertTrue(
+            any(hasattr(cell, "neighbours") for row in game.matrix for cell in row)
+        )
+
+    def test_measure_restores_random_state(self):
+        state = random.getstate()
+        calibration = EngineCalibration.measure()
+
+        self.assertEqual(state, random.getstate())
+        self.assertGreater(calibration.object_move, 0)
+        self.assertGreater(calibration.indexed_move, 0)
+        self.assertGreater(calibration.indexed_setup, 0)
+
+    def test_calibration_board_has_all_cells_created(self):
+        state = random.getstate()
+        game = EngineCalibration._create_board()
+        random.setstate(state)
+
+        self.assertEqual(
+            game.COUNT_CELLS, sum(len(row.created_cells()) for row in game.matrix)
+        )
+
+    @patch.dict(EngineCalibration._loaded)
+    @patch.object(EngineCalibration, "measure")
+    def test_load_caches_calibration(self, measure):
+        measure.return_value = EngineCalibration(3, 2, 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "calibration.json")
+
+            self.assertEqual(
+                {"object_move": 3, "indexed_move": 2, "indexed_setup": 1},
+                vars(EngineCalibration.load(path)),
+            )
+            # Later loads in the same process do not read the file again
+            os.unlink(path)
+            self.assertIs(EngineCalibration.load(path), EngineCalibration.load(path))
+            self.assertEqual(1, measure.call_count)
+
+            EngineCalibration._loaded.clear()
+            self.assertEqual(
+                {"object_move": 3, "indexed_move": 2, "indexed_setup": 1},
+                vars(EngineCalibration.load(path)),
+            )
+            self.assertEqual(2, measure.call_count)
+
+            EngineCalibration._loaded.clear()
+            self.assertEqual(
+                {"object_move": 3, "indexed_move": 2, "indexed_setup": 1},
+                vars(EngineCalibration.load(path)),
+            )
+            self.assertEqual(2, measure.call_count)
+
+            with open(path, "w") as f:
+                f.write("{")
+            EngineCalibration._loaded.clear()
+            EngineCalibration.load(path)
+            self.assertEqual(3, measure.call_count)